@@ -1,54 +1,87 @@
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Set, Optional
+from typing import Callable, Deque, Dict, FrozenSet, Set, Optional, Tuple
 
-import orjson
 import discord
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback; orjson is listed in requirements.txt but not strictly required
+    import json
+
+    orjson = None
+
 # ---------------------------
 # Basic setup
 # ---------------------------
 LOGS_DIR = Path(__file__).with_name("logs")
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 APP_LOG = LOGS_DIR / "app.log"
-if APP_LOG.exists():
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    rotated = LOGS_DIR / f"app_{timestamp}.log"
-    try:
-        APP_LOG.rename(rotated)
-    except OSError as exc:
-        # Fall back to continuing with the existing log if rotation fails
-        print(f"Warning: could not rotate existing app.log: {exc}", file=sys.stderr)
-LOG_FILE = APP_LOG
-
-# Minimal logging configuration: INFO for important events, DEBUG if you explicitly enable it.
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE, encoding="utf-8"),
-        logging.StreamHandler(sys.stdout),
-    ],
-)
+LOG_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+
 logger = logging.getLogger("claim-gift")
-# suppress very verbose discord library logs by default
-logging.getLogger("discord").setLevel(logging.WARNING)
-logging.getLogger("discord.gateway").setLevel(logging.WARNING)
+
+
+# Rotate the previous app.log and install handlers. Called from the entrypoint rather than at
+# import time so importing this module (tests, tooling) doesn't touch the logs directory.
+def _init_logging() -> None:
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    if APP_LOG.exists():
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        rotated = LOGS_DIR / f"app_{timestamp}.log"
+        try:
+            APP_LOG.rename(rotated)
+        except OSError as exc:
+            # Fall back to continuing with the existing log if rotation fails
+            print(f"Warning: could not rotate existing app.log: {exc}", file=sys.stderr)
+
+    # Minimal logging configuration: INFO for important events, DEBUG if you explicitly enable it.
+    # QueueHandler.prepare() still runs on the emitting (event loop) thread: it merges the %-args into
+    # the message, renders any traceback, and copies the record. Only the LOG_FORMAT prefix and the
+    # file/console write() calls move to the QueueListener thread. The file is only created on the
+    # first record, and the console handler is only attached when someone is actually watching stdout.
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = logging.FileHandler(APP_LOG, encoding="utf-8", delay=True)
+    file_handler.setFormatter(formatter)
+    handlers = [file_handler]
+    if sys.stdout is not None and sys.stdout.isatty():
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)  # drains whatever is still queued at shutdown
+
+    # no formatter on the QueueHandler itself, or the LOG_FORMAT prefix would be applied twice
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    # suppress very verbose discord library logs by default
+    logging.getLogger("discord").setLevel(logging.WARNING)
+    logging.getLogger("discord.gateway").setLevel(logging.WARNING)
+
 
 CONFIG_PATH = Path(__file__).with_name("config.json")
+CHANNEL_REPR_CAP = 1024  # channels whose log label we keep cached
+CLICK_QUEUE_MAX = 1000  # pending click items kept during bursts; newer items are dropped beyond this
+CLICK_BATCH_SIZE = 8  # items a worker takes per pass; a batch's clicks run concurrently
+LABEL_MATCH_CACHE_CAP = 4096  # distinct raw button labels whose match result we remember
+PROCESSED_CAP = 8192  # hard upper bound on remembered message IDs, on top of the TTL sweep
 
 
 # ---------------------------
 # Utilities
 # ---------------------------
-def _utcnow() -> datetime:
-    return datetime.now(timezone.utc)
-
-
 def _format_ms(value: Optional[float]) -> str:
     return f"{value:.1f}ms" if value is not None else "?"
 
@@ -56,13 +89,22 @@ def _format_ms(value: Optional[float]) -> str:
 # ---------------------------
 # Config dataclass + loaders
 # ---------------------------
-@dataclass
+# __slots__ storage for dataclasses where supported (3.10+); plain instance dicts on older Pythons
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Config:
     token: str
-    claim_button_texts: Set[str] = field(default_factory=lambda: {"claim gift"})
-    allowed_guild_ids: Set[int] = field(default_factory=set)
-    allowed_channel_ids: Set[int] = field(default_factory=set)
-    worker_count: int = 2  # number of concurrent click workers
+    claim_button_texts: FrozenSet[str] = field(default_factory=lambda: frozenset({"claim gift"}))
+    allowed_guild_ids: FrozenSet[int] = field(default_factory=frozenset)
+    allowed_channel_ids: FrozenSet[int] = field(default_factory=frozenset)
+    # preformatted "id, id, ..." strings for the startup log
+    allowed_guild_ids_display: str = ""
+    allowed_channel_ids_display: str = ""
+    # number of click workers; each handles up to CLICK_BATCH_SIZE messages at once during bursts, and a
+    # message may fan out to several button clicks, so peak in-flight clicks are worker_count * CLICK_BATCH_SIZE * buttons
+    worker_count: int = 2
     processed_ttl_seconds: int = 300  # how long to remember processed message IDs
 
 
@@ -78,52 +120,71 @@ def _parse_id_list(values) -> Set[int]:
 
 def _parse_label_list(values, legacy_value: str = "") -> Set[str]:
     parsed: Set[str] = set()
-    if isinstance(values, (list, tuple)):
-        sources = values
-    elif values:
-        sources = [values]
-    else:
-        sources = []
+    sources = values if isinstance(values, (list, tuple)) else ([values] if values else [])
 
+    # casefold rather than lower so non-ASCII labels (ß, İ, ...) compare case-insensitively too
     for raw in sources:
         text = str(raw).strip()
         if text:
-            parsed.add(text.lower())
+            parsed.add(text.casefold())
 
     legacy = str(legacy_value or "").strip()
     if legacy:
-        parsed.add(legacy.lower())
+        parsed.add(legacy.casefold())
 
     if not parsed:
         parsed.add("claim gift")
     return parsed
 
 
+# (mtime_ns, size) of the last parsed config.json -> parsed Config
+_CONFIG_CACHE: Optional[Tuple[Tuple[int, int], Config]] = None
+
+
 def load_config() -> Config:
-    if not CONFIG_PATH.exists():
-        raise FileNotFoundError(f"Missing config file at {CONFIG_PATH}")
+    global _CONFIG_CACHE
+    try:
+        st = CONFIG_PATH.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Missing config file at {CONFIG_PATH}") from None
 
-    with CONFIG_PATH.open("rb") as fp:
-        raw = orjson.loads(fp.read())
+    key = (st.st_mtime_ns, st.st_size)
+    if _CONFIG_CACHE is not None and _CONFIG_CACHE[0] == key:
+        return _CONFIG_CACHE[1]
+
+    data = CONFIG_PATH.read_bytes()
+    raw = orjson.loads(data) if orjson is not None else json.loads(data)
 
     token = str(raw.get("token", "")).strip()
     if not token or token == "YOUR_DISCORD_TOKEN":
         raise ValueError("Please set your account token in config.json (token).")
 
-    claim_texts = _parse_label_list(raw.get("claim_button_texts"), raw.get("claim_button_text", ""))
-    guild_ids = _parse_id_list(raw.get("allowed_guild_ids"))
-    channel_ids = _parse_id_list(raw.get("allowed_channel_ids"))
+    claim_texts = frozenset(_parse_label_list(raw.get("claim_button_texts"), raw.get("claim_button_text", "")))
+    guild_ids = frozenset(_parse_id_list(raw.get("allowed_guild_ids")))
+    channel_ids = frozenset(_parse_id_list(raw.get("allowed_channel_ids")))
     worker_count = int(raw.get("worker_count", 2)) if raw.get("worker_count") else 2
     ttl = int(raw.get("processed_ttl_seconds", 300)) if raw.get("processed_ttl_seconds") else 300
 
-    return Config(
+    config = Config(
         token=token,
         claim_button_texts=claim_texts,
         allowed_guild_ids=guild_ids,
         allowed_channel_ids=channel_ids,
-        worker_count=max(1, min(8, worker_count)),  # clamp to a sane range
+        allowed_guild_ids_display=", ".join(map(str, sorted(guild_ids))),
+        allowed_channel_ids_display=", ".join(map(str, sorted(channel_ids))),
+        worker_count=max(1, min(8, worker_count)),  # clamp so burst width (workers * CLICK_BATCH_SIZE messages) stays bounded
         processed_ttl_seconds=max(30, ttl),
     )
+    _CONFIG_CACHE = (key, config)
+    return config
+
+
+# one pending click: what the workers need from an edit event, without a per-item dict
+@dataclass(**_DATACLASS_SLOTS)
+class ClickItem:
+    message: discord.Message
+    event_received_at: int  # time.monotonic_ns() when the event was handled
+    source: str
 
 
 # ---------------------------
@@ -132,175 +193,264 @@ def load_config() -> Config:
 async def main() -> None:
     config = load_config()
     logger.info("Loaded configuration: workers=%d claim_texts=%s", config.worker_count, sorted(config.claim_button_texts))
+    # _parse_label_list already stripped + casefolded these; intern once so the membership test stays cheap
+    claim_labels = frozenset(sys.intern(t) for t in config.claim_button_texts)
+    # raw button label -> matched?  Labels repeat across messages ("Claim Gift", "Play", ...), so most
+    # components are answered by one dict probe without the strip()/casefold() allocations.
+    label_match_cache: Dict[str, bool] = {}
+    # levels are fixed after _init_logging(); check once instead of building log args per component
+    _info_on = logger.isEnabledFor(logging.INFO)
+    _debug_on = logger.isEnabledFor(logging.DEBUG)
     client = discord.Client(bot=False)
 
-    # A small bounded queue for click tasks. Bounded so memory won't explode during bursts.
-    click_queue: asyncio.Queue = asyncio.Queue(maxsize=1000)
+    # A small bounded buffer for click tasks. Bounded (CLICK_QUEUE_MAX) so memory won't explode during
+    # bursts. A plain deque plus one Event is enough here: producers and workers share the event loop
+    # thread, so append/popleft need no locking and there's no per-item Future as with asyncio.Queue.
+    click_buffer: Deque[ClickItem] = deque()
+    work_available = asyncio.Event()
 
-    # processed_messages maps message_id -> timestamp when it was processed
-    processed_messages: Dict[int, datetime] = {}
-    processed_lock = asyncio.Lock()  # protect processed_messages
+    # processed_messages maps message_id -> time.monotonic() when it was processed. Entries are only
+    # ever appended with the current time, so the dict is ordered oldest-first by timestamp.
+    # Only ever touched from synchronous sections (no await between check and set), so the
+    # single-threaded event loop makes every access atomic without a lock.
+    processed_messages: "OrderedDict[int, float]" = OrderedDict()
 
-    # Provide a periodic cleanup to remove stale entries
+    # Provide a periodic cleanup to remove stale entries; only walks the expired prefix
     async def processed_cleanup_task():
         while True:
             await asyncio.sleep(max(10, config.processed_ttl_seconds // 4))
-            cutoff = _utcnow() - timedelta(seconds=config.processed_ttl_seconds)
-            async with processed_lock:
-                removed = [mid for mid, ts in processed_messages.items() if ts < cutoff]
-                for mid in removed:
-                    del processed_messages[mid]
-            if removed:
-                logger.debug("Cleaned up %d processed message ids", len(removed))
+            cutoff = time.monotonic() - config.processed_ttl_seconds
+            removed = 0
+            while processed_messages and next(iter(processed_messages.values())) < cutoff:
+                processed_messages.popitem(last=False)
+                removed += 1
+            if removed and _debug_on:
+                logger.debug("Cleaned up %d processed message ids", removed)
+
+    # channel_id -> "#name (id)" for log lines; discord.py's channel __str__ is rebuilt on every call
+    channel_repr_cache: "OrderedDict[int, str]" = OrderedDict()
+
+    def _chan(channel) -> str:
+        channel_id = channel.id
+        text = channel_repr_cache.get(channel_id)
+        if text is None:
+            text = channel_repr_cache[channel_id] = f"#{getattr(channel, 'name', None) or channel_id} ({channel_id})"
+            if len(channel_repr_cache) > CHANNEL_REPR_CAP:
+                channel_repr_cache.popitem(last=False)
+        else:
+            channel_repr_cache.move_to_end(channel_id)
+        return text
 
     # Worker that performs clicks
     async def worker(worker_id: int):
         logger.info("Worker-%d started", worker_id)
         while True:
-            item = await click_queue.get()
-            message = item["message"]
-            event_received_at = item["event_received_at"]
-            source = item["source"]
-            try:
-                await _attempt_click(message, event_received_at, source)
-            except Exception:
-                logger.exception("Unhandled exception in worker-%d while clicking message %s", worker_id, getattr(message, "id", "unknown"))
-            finally:
-                click_queue.task_done()
-
-    # the core click routine (keeps same click semantics as your original code)
-    async def _attempt_click(message: discord.Message, event_received_at: datetime, source: str) -> bool:
+            await work_available.wait()
+            while click_buffer:
+                if len(click_buffer) == 1:
+                    # common case: no gather/task overhead for a lone item
+                    item = click_buffer.popleft()
+                    try:
+                        await _attempt_click(item.message, item.event_received_at, item.source)
+                    except Exception:
+                        logger.exception("Unhandled exception in worker-%d while clicking message %s", worker_id, getattr(item.message, "id", "unknown"))
+                    continue
+
+                # burst: take up to CLICK_BATCH_SIZE items and overlap their click round-trips
+                batch = [click_buffer.popleft() for _ in range(min(CLICK_BATCH_SIZE, len(click_buffer)))]
+                results = await asyncio.gather(
+                    *(_attempt_click(i.message, i.event_received_at, i.source) for i in batch),
+                    return_exceptions=True,
+                )
+                # a cancellation of this worker surfaces from the gather itself; a CancelledError in the
+                # results only means that one attempt was cancelled, so it is logged like any failure
+                for item, result in zip(batch, results):
+                    if isinstance(result, BaseException):
+                        logger.error("Unhandled exception in worker-%d while clicking message %s", worker_id, getattr(item.message, "id", "unknown"), exc_info=result)
+            # buffer is empty and nothing can append between the check above and here (no await)
+            work_available.clear()
+
+    # the core click routine: one pass to collect clickable claim buttons, then click them all at once
+    async def _attempt_click(message: discord.Message, event_received_at: int, source: str) -> bool:
         # compute a few cheap things early
         msg_id = message.id
-        # iterate over components *once* and try to click the first matching interactive button
+        # duplicate edits of an already-clicked message: bail before scanning components. Nothing
+        # below awaits until the ID is marked, so this single check also covers the insert.
+        if msg_id in processed_messages:
+            if _debug_on:
+                logger.debug("Already processed message %s", msg_id)
+            return False
+        # iterate over components *once* and collect every matching interactive button
         saw_claim_label = False
-        seen_labels = []
-        now = _utcnow()
-        created_age_ms = (now - message.created_at).total_seconds() * 1000 if getattr(message, "created_at", None) else None
-        edited_age_ms = (now - message.edited_at).total_seconds() * 1000 if getattr(message, "edited_at", None) else None
-
-        # For speed, access components directly and avoid allocations where possible
-        for row in getattr(message, "components", []) or []:
-            for comp in getattr(row, "children", []) or []:
-                label = getattr(comp, "label", "") or ""
-                seen_labels.append(label)
-                normalized = label.strip().lower()
-                if not normalized or normalized not in config.claim_button_texts:
+        seen_labels = []  # only filled when DEBUG is on (for the no-match log below)
+        candidates = []  # (component, label, custom_id)
+
+        # For speed, access components directly and avoid allocations where possible;
+        # everything used per component is bound to a local (LOAD_FAST) up front
+        _g = getattr
+        _strip = str.strip
+        _casefold = str.casefold
+        _labels = claim_labels
+        _match_cache = label_match_cache
+        for row in _g(message, "components", []) or []:
+            for comp in _g(row, "children", []) or []:
+                label = _g(comp, "label", "") or ""
+                if _debug_on:
+                    seen_labels.append(label)
+                matched = _match_cache.get(label)
+                if matched is None:
+                    matched = _casefold(_strip(label)) in _labels
+                    if len(_match_cache) >= LABEL_MATCH_CACHE_CAP:
+                        _match_cache.clear()
+                    _match_cache[label] = matched
+                if not matched:
                     continue
 
                 saw_claim_label = True
-                custom_id = getattr(comp, "custom_id", None)
-                is_url = bool(getattr(comp, "url", None))
-                disabled = bool(getattr(comp, "disabled", False))
+                custom_id = _g(comp, "custom_id", None)
+                url = _g(comp, "url", None)
+                disabled = _g(comp, "disabled", False)
 
                 if disabled:
-                    # cheap log at debug level
-                    logger.debug('Skipping disabled button "%s" on message %s in %s', label, msg_id, message.channel)
+                    if _debug_on:
+                        logger.debug('Skipping disabled button "%s" on message %s in %s', label, msg_id, _chan(message.channel))
                     continue
 
-                if is_url or not custom_id:
-                    logger.debug('Skipping non-interactive button "%s" on message %s (url=%s custom_id=%s)', label, msg_id, getattr(comp, "url", None), custom_id)
+                if url or not custom_id:
+                    if _debug_on:
+                        logger.debug('Skipping non-interactive button "%s" on message %s (url=%s custom_id=%s)', label, msg_id, url, custom_id)
                     continue
 
-                # mark processed early (guard against quick duplicate edits)
-                async with processed_lock:
-                    if msg_id in processed_messages:
-                        logger.debug("Already processed message %s", msg_id)
-                        return False
-                    processed_messages[msg_id] = _utcnow()
+                candidates.append((comp, label, custom_id))
+
+        if candidates:
+            # mark processed before the first await (guards against quick duplicate edits)
+            processed_messages[msg_id] = time.monotonic()
+            if len(processed_messages) > PROCESSED_CAP:
+                processed_messages.popitem(last=False)
 
-                before_click = _utcnow()
-                since_event_ms = (before_click - event_received_at).total_seconds() * 1000
+            since_event_ms = (time.monotonic_ns() - event_received_at) / 1e6
+            # wall-clock sample for the message ages; the ages themselves are only computed for the log
+            click_wall_time = time.time() if _info_on else 0.0
+            if len(candidates) == 1:
                 try:
-                    # this is the actual click call you used previously
-                    await comp.click()
-                    after_click = _utcnow()
-                    total_since_event_ms = (after_click - event_received_at).total_seconds() * 1000
+                    results = [await candidates[0][0].click()]
+                except Exception as exc:
+                    results = [exc]
+            else:
+                # multi-gift drop: one concurrent round-trip instead of one per button
+                results = await asyncio.gather(*(c[0].click() for c in candidates), return_exceptions=True)
+            total_since_event_ms = (time.monotonic_ns() - event_received_at) / 1e6
+
+            created_age_ms = edited_age_ms = None
+            if _info_on:
+                # wall-clock ages against Discord timestamps: plain float subtraction
+                created_at = getattr(message, "created_at", None)
+                edited_at = getattr(message, "edited_at", None)
+                created_age_ms = (click_wall_time - created_at.timestamp()) * 1000 if created_at else None
+                edited_age_ms = (click_wall_time - edited_at.timestamp()) * 1000 if edited_at else None
+
+            clicked = False
+            for (comp, label, custom_id), result in zip(candidates, results):
+                if isinstance(result, BaseException):
+                    logger.error("Failed to click button on message %s (custom_id=%s since_event=%.1fms): %s", msg_id, custom_id, since_event_ms, result)
+                    continue
+                clicked = True
+                if _info_on:
                     logger.info(
-                        'Clicked "%s" on message %s in %s via %s (age=%s edited_age=%s since_event=%s after_click=%s custom_id=%s)',
-                        label or next(iter(config.claim_button_texts)),
+                        'Clicked "%s" on message %s in %s via %s (age=%s edited_age=%s since_event=%.1fms after_click=%.1fms custom_id=%s)',
+                        label,
                         msg_id,
-                        message.channel,
+                        _chan(message.channel),
                         source,
                         _format_ms(created_age_ms),
                         _format_ms(edited_age_ms),
-                        _format_ms(since_event_ms),
-                        _format_ms(total_since_event_ms),
+                        since_event_ms,
+                        total_since_event_ms,
                         custom_id,
                     )
-                    return True
-                except Exception as exc:
-                    logger.error("Failed to click button on message %s (custom_id=%s since_event=%s): %s", msg_id, custom_id, _format_ms(since_event_ms), exc)
-                    return False
+            return clicked
 
         # If we get here, no clickable button found
+        if not _debug_on:
+            return False
+        labels_str = repr(seen_labels) if seen_labels else "none"
         if saw_claim_label:
-            logger.debug("No clickable claim buttons on message %s (labels=%s)", getattr(message, "id", None), ", ".join(repr(l) for l in seen_labels) or "none")
+            logger.debug("No clickable claim buttons on message %s (labels=%s)", msg_id, labels_str)
         else:
-            logger.debug("No claim labels matched on message %s (labels=%s)", getattr(message, "id", None), ", ".join(repr(l) for l in seen_labels) or "none")
+            logger.debug("No claim labels matched on message %s (labels=%s)", msg_id, labels_str)
         return False
 
-    # Fast allowlist check (cheap early return)
-    def message_allowed(message: discord.Message) -> bool:
-        if config.allowed_guild_ids:
+    # Fast allowlist check, specialized once on which allowlists are configured
+    def _build_message_allowed() -> Callable[[discord.Message], bool]:
+        guild_ids = config.allowed_guild_ids
+        channel_ids = config.allowed_channel_ids
+
+        if not guild_ids and not channel_ids:
+            return lambda message: True
+
+        if not channel_ids:
+            def guild_allowed(message: discord.Message) -> bool:
+                g = message.guild
+                return g is not None and g.id in guild_ids
+            return guild_allowed
+
+        if not guild_ids:
+            def channel_allowed(message: discord.Message) -> bool:
+                return message.channel.id in channel_ids
+            return channel_allowed
+
+        def guild_and_channel_allowed(message: discord.Message) -> bool:
             g = message.guild
-            if g is None or g.id not in config.allowed_guild_ids:
-                return False
-        if config.allowed_channel_ids and message.channel.id not in config.allowed_channel_ids:
-            return False
-        return True
+            return g is not None and g.id in guild_ids and message.channel.id in channel_ids
+        return guild_and_channel_allowed
 
-    # Enqueue a message for worker processing (non-blocking)
-    async def enqueue_click(message: discord.Message, event_received_at: datetime, source: str) -> None:
-        try:
-            click_queue.put_nowait({"message": message, "event_received_at": event_received_at, "source": source})
-        except asyncio.QueueFull:
+    message_allowed = _build_message_allowed()
+
+    # Enqueue a message for worker processing (non-blocking; plain function so the gateway handler never suspends here)
+    def enqueue_click(message: discord.Message, event_received_at: int, source: str) -> None:
+        if len(click_buffer) >= CLICK_QUEUE_MAX:
             logger.warning("Click queue is full; dropping message %s", message.id)
+            return
+        click_buffer.append(ClickItem(message, event_received_at, source))
+        work_available.set()
+
+    # our own user ID, captured in on_ready; None until then (pre-ready events are treated as not-self)
+    self_id: Optional[int] = None
 
     # Event handlers: minimal and early-exit fast
     @client.event
     async def on_ready():
+        nonlocal self_id
+        self_id = client.user.id
         logger.info("Ready as %s (%s)", client.user, client.user.id)
         if config.allowed_guild_ids:
-            logger.info("Guild allowlist: %s", ", ".join(str(g) for g in sorted(config.allowed_guild_ids)))
+            logger.info("Guild allowlist: %s", config.allowed_guild_ids_display)
         if config.allowed_channel_ids:
-            logger.info("Channel allowlist: %s", ", ".join(str(c) for c in sorted(config.allowed_channel_ids)))
+            logger.info("Channel allowlist: %s", config.allowed_channel_ids_display)
 
+    # Only edits are acted on (gift buttons appear via edits), so no on_message handler is
+    # registered at all: new-message events never allocate a handler coroutine.
     async def _handle_incoming(message: discord.Message, source: str):
-        if source == "message":
-            # We only act on edits; ignore new message events
-            return
-
         # very cheap early checks
-        if message.author == client.user:
+        if message.author.id == self_id:
             return
         if not message_allowed(message):
             return
 
-        # quickly test whether there are any component children; avoid building lists
-        comps = getattr(message, "components", None) or []
-        has_children = False
-        for r in comps:
-            if getattr(r, "children", None):
-                has_children = True
-                break
-        if not has_children:
+        # ensure we don't enqueue duplicates
+        if message.id in processed_messages:
             return
 
-        # ensure we don't enqueue duplicates
-        async with processed_lock:
-            if message.id in processed_messages:
-                return
+        # quickly test whether there are any component children; avoid building lists
+        comps = getattr(message, "components", None) or ()
+        if not any(getattr(r, "children", None) for r in comps):
+            return
 
-        # small metadata for metrics; cheap timestamp capture
-        event_received_at = _utcnow()
+        # small metadata for metrics; cheap monotonic timestamp capture (ns)
+        event_received_at = time.monotonic_ns()
         # enqueue for background workers (fast)
-        await enqueue_click(message, event_received_at, source)
-
-    @client.event
-    async def on_message(message: discord.Message):
-        # don't await heavy work here; just call the fast handler
-        await _handle_incoming(message, source="message")
+        enqueue_click(message, event_received_at, source)
 
     @client.event
     async def on_message_edit(before, after: discord.Message):
@@ -319,6 +469,7 @@ async def main() -> None:
 # Entrypoint
 # ---------------------------
 if __name__ == "__main__":
+    _init_logging()
     if sys.platform != "win32":
         try:
             import uvloop